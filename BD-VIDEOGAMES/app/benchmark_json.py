@@ -0,0 +1,43 @@
+"""
+Microbenchmark de serialización JSON para /publishers
+
+Compara el camino anterior (to_dict(orient='records') + jsonable_encoder +
+JSONResponse.render, lo que hacía FastAPI al devolver la lista de dicts) con
+codificar_filas, el codificador por columnas + orjson que usa respuesta_json.
+
+Uso: python benchmark_json.py
+"""
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from serializacion import codificar_filas
+
+
+def generar_publishers(n_filas):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Editora": [f"Editora {i}" for i in range(n_filas)],
+        "Juegos Publicados": rng.integers(1, 500, n_filas),
+        "Ventas Totales (M)": np.round(rng.random(n_filas) * 100, 2),
+        "Plataformas": rng.integers(1, 30, n_filas),
+    })
+
+
+def codificar_registros(df):
+    return JSONResponse(content=jsonable_encoder(df.to_dict(orient='records'))).body
+
+
+if __name__ == "__main__":
+    print(f"{'Filas':>8} {'records+jsonable (ms)':>22} {'codificar_filas (ms)':>21} {'Mejora':>7}")
+    for n_filas in (10, 1_000, 100_000):
+        df = generar_publishers(n_filas)
+        assert json.loads(codificar_registros(df)) == json.loads(codificar_filas(df))
+        repeticiones = 3 if n_filas >= 100_000 else 50
+        t_registros = min(timeit.repeat(lambda: codificar_registros(df), number=1, repeat=repeticiones))
+        t_columnas = min(timeit.repeat(lambda: codificar_filas(df), number=1, repeat=repeticiones))
+        print(f"{n_filas:>8} {t_registros * 1000:>22.3f} {t_columnas * 1000:>21.3f} {t_registros / t_columnas:>6.1f}x")
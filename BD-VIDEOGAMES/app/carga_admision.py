@@ -0,0 +1,86 @@
+"""
+Prueba de carga del control de admisión
+
+Mide la latencia de /top_plataformas/tabla (clase ligera) primero sola y
+después junto a una ráfaga de /geografia/comparativa_juegos/grafico?game1=a
+(clase grafico), y cuenta los 429/503 con Retry-After devueltos a los gráficos.
+Cada petición lleva un parámetro _ distinto (ignorado por los endpoints pero
+parte de la clave de caché) para no medir aciertos de la caché.
+
+Uso: python carga_admision.py [http://localhost:8000] [segundos] [clientes_grafico]
+"""
+import itertools
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+CLIENTES_LIGEROS = 4
+contador = itertools.count(int(time.time() * 1000))
+
+
+def pedir(url):
+    inicio = time.monotonic()
+    try:
+        with urllib.request.urlopen(url, timeout=120) as respuesta:
+            respuesta.read()
+            return respuesta.status, None, time.monotonic() - inicio
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("Retry-After"), time.monotonic() - inicio
+
+
+def url_ligera(base):
+    return f"{base}/top_plataformas/tabla?plataforma=ps2&_={next(contador)}"
+
+
+def url_grafico(base):
+    return f"{base}/geografia/comparativa_juegos/grafico?game1=a&game2=zelda&_={next(contador)}"
+
+
+def cliente(base, generar_url, fin, resultados):
+    while time.monotonic() < fin:
+        resultados.append(pedir(generar_url(base)))
+
+
+def fase(base, segundos, clientes_grafico):
+    fin = time.monotonic() + segundos
+    ligeras, graficos = [], []
+    with ThreadPoolExecutor(CLIENTES_LIGEROS + clientes_grafico) as pool:
+        for _ in range(CLIENTES_LIGEROS):
+            pool.submit(cliente, base, url_ligera, fin, ligeras)
+        for _ in range(clientes_grafico):
+            pool.submit(cliente, base, url_grafico, fin, graficos)
+    return ligeras, graficos
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+def resumen(nombre, ligeras, graficos):
+    latencias = [t for estado, _, t in ligeras if estado == 200]
+    print(f"== {nombre}")
+    print(
+        f"  ligeras: {len(ligeras)} peticiones {dict(Counter(e for e, _, _ in ligeras))}"
+        f" p50={percentil(latencias, 0.50):.0f}ms p99={percentil(latencias, 0.99):.0f}ms"
+    )
+    if graficos:
+        rechazos = [(e, r) for e, r, t in graficos if e in (429, 503)]
+        rapidos = [t for e, _, t in graficos if e == 429]
+        print(
+            f"  graficos: {len(graficos)} peticiones {dict(Counter(e for e, _, _ in graficos))}"
+            f" con Retry-After={sum(1 for _, r in rechazos if r)}/{len(rechazos)}"
+            + (f" p99 del 429={percentil(rapidos, 0.99):.0f}ms" if rapidos else "")
+        )
+
+
+if __name__ == "__main__":
+    base = (sys.argv[1] if len(sys.argv) > 1 else f"http://localhost:{os.getenv('API_PORT', '8000')}").rstrip('/')
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    clientes_grafico = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    resumen("Solo ligeras", *fase(base, segundos, 0))
+    resumen(f"Ligeras + {clientes_grafico} clientes de gráficos", *fase(base, segundos, clientes_grafico))
@@ -1,14 +1,35 @@
 import pandas as pd
 from fastapi import FastAPI, HTTPException, Path
-from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from serializacion import codificar_filas
 from sqlalchemy import create_engine
 import matplotlib.pyplot as plt
 from io import BytesIO
 import os
 import numpy as np  
 from fastapi import Query
+from typing import List
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from contextlib import asynccontextmanager, closing
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    # Precalentar la caché en segundo plano para no retrasar el arranque
+    if cache_disponible and CACHE_PRECALENTAR:
+        threading.Thread(target=precalentar_cache, daemon=True).start()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # Configuración de la base de datos
 MYSQL_HOST = os.getenv('MYSQL_HOST', 'mysql')
@@ -18,6 +39,77 @@ MYSQL_DB = os.getenv('MYSQL_DB', 'video_games')
 
 engine = create_engine(f'mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}')
 
+# Control de admisión por clase de coste
+# Cada clase tiene su propio límite de concurrencia, cola de espera y tiempo
+# máximo de ejecución en MySQL (MAX_EXECUTION_TIME cancela la sentencia en el
+# servidor). Los gráficos comparten el estado global de pyplot, por eso su
+# concurrencia por defecto es 1.
+ADMISION = {
+    'grafico': {
+        'concurrencia': int(os.getenv('ADMISION_GRAFICO_CONCURRENCIA', '1')),
+        'cola': int(os.getenv('ADMISION_GRAFICO_COLA', '4')),
+        'timeout_ms': int(os.getenv('ADMISION_GRAFICO_TIMEOUT_MS', '15000')),
+    },
+    'pesada': {
+        'concurrencia': int(os.getenv('ADMISION_PESADA_CONCURRENCIA', '3')),
+        'cola': int(os.getenv('ADMISION_PESADA_COLA', '6')),
+        'timeout_ms': int(os.getenv('ADMISION_PESADA_TIMEOUT_MS', '10000')),
+    },
+    'ligera': {
+        'concurrencia': int(os.getenv('ADMISION_LIGERA_CONCURRENCIA', '8')),
+        'cola': int(os.getenv('ADMISION_LIGERA_COLA', '32')),
+        'timeout_ms': int(os.getenv('ADMISION_LIGERA_TIMEOUT_MS', '5000')),
+    },
+}
+ADMISION_ESPERA_MAX = float(os.getenv('ADMISION_ESPERA_MAX', '10'))
+
+def crear_engine_clase(clase):
+    conf = ADMISION[clase]
+    return create_engine(
+        f'mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}',
+        pool_size=conf['concurrencia'],
+        max_overflow=0,
+        pool_pre_ping=True,
+        connect_args={
+            'init_command': f"SET SESSION MAX_EXECUTION_TIME={conf['timeout_ms']}",
+            'read_timeout': conf['timeout_ms'] // 1000 + 5,
+        }
+    )
+
+# Pools separados: una ráfaga de gráficos no puede agotar las conexiones de las tablas
+engines = {clase: crear_engine_clase(clase) for clase in ADMISION}
+
+def clase_admision(ruta):
+    if ruta.endswith('/grafico'):
+        return 'grafico'
+    if ruta.startswith('/publishers'):
+        return 'pesada'
+    if ruta.startswith(('/top_plataformas/', '/analisis/', '/tendencias/', '/explorar')):
+        return 'ligera'
+    return None
+
+mensajes_cancelacion = {
+    3024: "La consulta superó el tiempo máximo de ejecución",
+    # 2013 llega tanto por read_timeout como por una caída real de MySQL
+    2013: "Se perdió la conexión con la base de datos, inténtalo más tarde",
+}
+
+def verificar_cancelacion(e):
+    """
+    Convierte una sentencia cancelada por tiempo (MySQL 3024) o una conexión
+    perdida (2013) en un 503 con Retry-After
+    """
+    # pandas envuelve el error de SQLAlchemy, que a su vez envuelve el de pymysql
+    while e is not None:
+        codigo = e.args[0] if e.args else None
+        if codigo in mensajes_cancelacion:
+            raise HTTPException(
+                status_code=503,
+                detail=mensajes_cancelacion[codigo],
+                headers={"Retry-After": str(int(ADMISION_ESPERA_MAX))}
+            )
+        e = getattr(e, 'orig', None) or e.__cause__
+
 # Carga inicial de datos
 tablas = ['genre', 'game', 'game_platform', 'game_publisher', 'platform', 'publisher', 'region', 'region_sales']
 carpeta_destino = '/app/data'
@@ -45,6 +137,289 @@ for tabla in tablas:
         print(f"Archivo {tabla}.csv no encontrado")
 
 
+# Índice de bitmaps sobre las filas de hechos (region_sales + game_platform)
+# Cada valor de cada dimensión tiene un bitmap empaquetado (np.packbits) con
+# un bit por fila; los filtros se resuelven con OR dentro de una dimensión y
+# AND entre dimensiones, y la agregación es un np.bincount vectorizado.
+dimensiones_explorar = {
+    'plataforma': ('platform', 'platform_id', 'platform_name'),
+    'genero': ('genre', 'genre_id', 'genre_name'),
+    'region': ('region', 'region_id', 'region_name'),
+    'editora': ('publisher', 'publisher_id', 'publisher_name'),
+}
+
+def construir_indice_bitmaps():
+    hechos = (
+        dfs['region_sales']
+        .merge(dfs['game_platform'], left_on='game_platform_id', right_on='id')
+        .merge(dfs['game_publisher'], left_on='game_publisher_id', right_on='id',
+               suffixes=('', '_gpub'))
+        .merge(dfs['game'], left_on='game_id', right_on='id', suffixes=('', '_game'))
+    )
+    n_filas = len(hechos)
+
+    def bitmaps_por_codigo(codigos, n_valores):
+        # Un bitmap por valor: fila i tiene el bit activo si codigos[i] == valor
+        return {
+            valor: np.packbits(codigos == valor)
+            for valor in range(n_valores)
+        }
+
+    indice = {
+        'n_filas': n_filas,
+        'ventas': hechos['num_sales'].to_numpy(dtype=np.float64),
+        'dimensiones': {},
+    }
+
+    for dimension, (tabla, columna, nombre) in dimensiones_explorar.items():
+        catalogo = dfs[tabla]
+        nombres = catalogo[nombre].fillna('').astype(str).to_numpy()
+        # Código denso por fila (posición en el catálogo) para agrupar con bincount
+        posicion = pd.Series(np.arange(len(catalogo)), index=catalogo['id'])
+        codigos = hechos[columna].map(posicion).fillna(-1).to_numpy(dtype=np.int64)
+        indice['dimensiones'][dimension] = {
+            'nombres': nombres,
+            'codigos': codigos,
+            'por_nombre': {n.lower(): i for i, n in enumerate(nombres)},
+            'bitmaps': bitmaps_por_codigo(codigos, len(nombres)),
+        }
+
+    años = hechos['release_year'].fillna(-1).to_numpy(dtype=np.int64)
+    años_unicos = np.unique(años[años >= 0])
+    indice['dimensiones']['año'] = {
+        'nombres': años_unicos.astype(str),
+        'codigos': np.where(años >= 0, np.searchsorted(años_unicos, años), -1),
+        'valores': años_unicos,
+        'bitmaps': {i: np.packbits(años == a) for i, a in enumerate(años_unicos)},
+    }
+
+    print(f"Índice de bitmaps construido sobre {n_filas} filas de ventas")
+    return indice
+
+try:
+    indice_bitmaps = construir_indice_bitmaps()
+except Exception as e:
+    indice_bitmaps = None
+    print(f"Error al construir índice de bitmaps: {str(e)}")
+
+
+class ControlAdmision:
+    def __init__(self, concurrencia, cola):
+        self.semaforo = asyncio.Semaphore(concurrencia)
+        self.cola = cola
+        self.en_cola = 0
+
+controles_admision = {
+    clase: ControlAdmision(conf['concurrencia'], conf['cola'])
+    for clase, conf in ADMISION.items()
+}
+
+
+# Registrado antes que la caché para que los aciertos de caché no ocupen plazas
+@app.middleware("http")
+async def control_admision(request, call_next):
+    clase = clase_admision(request.url.path)
+    if clase is None:
+        return await call_next(request)
+    
+    control = controles_admision[clase]
+    retry_after = {"Retry-After": str(int(ADMISION_ESPERA_MAX))}
+    if control.semaforo.locked() and control.en_cola >= control.cola:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": f"Demasiadas peticiones de tipo {clase}, inténtalo más tarde"},
+            headers=retry_after
+        )
+    
+    control.en_cola += 1
+    try:
+        await asyncio.wait_for(control.semaforo.acquire(), timeout=ADMISION_ESPERA_MAX)
+    except asyncio.TimeoutError:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Servicio saturado para peticiones de tipo {clase}"},
+            headers=retry_after
+        )
+    finally:
+        control.en_cola -= 1
+    
+    try:
+        return await call_next(request)
+    finally:
+        control.semaforo.release()
+
+
+# Caché persistente de resultados en disco (SQLite en el volumen /app/data)
+# Sobrevive a los reinicios del contenedor; la clave incluye la ruta, los
+# parámetros, la versión de la aplicación y la de los datos, por lo que un
+# despliegue con cambios en el código o en los CSV invalida las entradas anteriores.
+CACHE_RUTA = os.getenv('CACHE_RUTA', os.path.join(carpeta_destino, 'cache_resultados.sqlite'))
+CACHE_MAX_MB = float(os.getenv('CACHE_MAX_MB', '200'))
+CACHE_TTL = int(os.getenv('CACHE_TTL', str(7 * 24 * 3600)))
+CACHE_PRECALENTAR = os.getenv('CACHE_PRECALENTAR', '1') == '1'
+# Versión de la aplicación (p.ej. la etiqueta de la imagen); por defecto el hash de main.py
+CACHE_VERSION = os.getenv('CACHE_VERSION')
+
+rutas_cacheables = (
+    '/tablas',
+    '/top_plataformas/',
+    '/analisis/',
+    '/tendencias/',
+    '/comparar/',
+    '/geografia/',
+    '/publishers',
+    '/explorar',
+)
+
+def calcular_version_datos():
+    h = hashlib.md5()
+    for tabla in tablas:
+        ruta_archivo = os.path.join(carpeta_destino, f"{tabla}.csv")
+        if os.path.exists(ruta_archivo):
+            with open(ruta_archivo, 'rb') as f:
+                h.update(f.read())
+    return h.hexdigest()[:12]
+
+def calcular_version_app():
+    if CACHE_VERSION:
+        return CACHE_VERSION
+    with open(__file__, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()[:12]
+
+version_cache = f"{calcular_version_app()}-{calcular_version_datos()}"
+
+def conectar_cache():
+    return sqlite3.connect(CACHE_RUTA, timeout=10)
+
+def inicializar_cache():
+    os.makedirs(os.path.dirname(CACHE_RUTA), exist_ok=True)
+    with closing(conectar_cache()) as conn, conn:
+        # WAL es persistente en el fichero: basta con activarlo una vez
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS resultados (
+                clave TEXT PRIMARY KEY,
+                media_type TEXT,
+                contenido BLOB,
+                tamaño INTEGER,
+                creado REAL,
+                ultimo_acceso REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acceso ON resultados (ultimo_acceso)")
+        # Entradas de versiones anteriores de la aplicación o de los datos ya no son alcanzables
+        conn.execute("DELETE FROM resultados WHERE clave NOT LIKE ?", (f"{version_cache}|%",))
+
+def clave_cache(ruta, query_params):
+    params = "&".join(f"{k}={v}" for k, v in sorted(query_params.multi_items()))
+    return f"{version_cache}|{ruta}?{params}"
+
+def leer_cache(clave):
+    ahora = time.time()
+    with closing(conectar_cache()) as conn, conn:
+        fila = conn.execute(
+            "SELECT media_type, contenido, creado FROM resultados WHERE clave = ?",
+            (clave,)
+        ).fetchone()
+        if fila is None:
+            return None
+        if ahora - fila[2] > CACHE_TTL:
+            conn.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+            return None
+        conn.execute("UPDATE resultados SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave))
+        return fila[0], fila[1]
+
+def guardar_cache(clave, media_type, contenido):
+    ahora = time.time()
+    limite = int(CACHE_MAX_MB * 1024 * 1024)
+    if len(contenido) > limite:
+        return
+    with closing(conectar_cache()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?)",
+            (clave, media_type, contenido, len(contenido), ahora, ahora)
+        )
+        conn.execute("DELETE FROM resultados WHERE ? - creado > ?", (ahora, CACHE_TTL))
+        # Expulsión LRU hasta respetar el tamaño máximo
+        total = conn.execute("SELECT COALESCE(SUM(tamaño), 0) FROM resultados").fetchone()[0]
+        if total > limite:
+            for clave_lru, tamaño in conn.execute(
+                "SELECT clave, tamaño FROM resultados ORDER BY ultimo_acceso"
+            ).fetchall():
+                conn.execute("DELETE FROM resultados WHERE clave = ?", (clave_lru,))
+                total -= tamaño
+                if total <= limite:
+                    break
+
+try:
+    inicializar_cache()
+    cache_disponible = True
+except Exception as e:
+    cache_disponible = False
+    print(f"Error al inicializar caché en disco: {str(e)}")
+
+
+@app.middleware("http")
+async def cache_resultados(request, call_next):
+    ruta = request.url.path
+    if (
+        not cache_disponible
+        or request.method != "GET"
+        or not ruta.startswith(rutas_cacheables)
+    ):
+        return await call_next(request)
+    
+    clave = clave_cache(ruta, request.query_params)
+    try:
+        guardado = await run_in_threadpool(leer_cache, clave)
+    except Exception as e:
+        print(f"Error al leer caché: {str(e)}")
+        guardado = None
+    if guardado is not None:
+        media_type, contenido = guardado
+        return Response(content=contenido, media_type=media_type, headers={"X-Cache": "HIT"})
+    
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+    
+    contenido = b"".join([parte async for parte in response.body_iterator])
+    media_type = response.headers.get("content-type")
+    try:
+        await run_in_threadpool(guardar_cache, clave, media_type, contenido)
+    except Exception as e:
+        print(f"Error al guardar en caché: {str(e)}")
+    headers = dict(response.headers)
+    headers.pop("content-length", None)
+    headers["X-Cache"] = "MISS"
+    return Response(content=contenido, status_code=200, headers=headers, media_type=media_type)
+
+
+
+# Modelos de respuesta JSON
+# Documentan el esquema en OpenAPI (application/json, con text/html como
+# alternativa); la serialización real se hace con respuesta_json para evitar
+# jsonable_encoder sobre escalares de NumPy.
+class PublisherResumen(BaseModel):
+    editora: str = Field(alias="Editora")
+    juegos_publicados: int = Field(alias="Juegos Publicados")
+    ventas_totales: float = Field(alias="Ventas Totales (M)")
+    plataformas: int = Field(alias="Plataformas")
+
+class ExploracionFila(BaseModel):
+    grupo: str = Field(alias="Grupo")
+    ventas: float = Field(alias="Ventas (M)")
+
+def respuesta_json(df):
+    return Response(content=codificar_filas(df), media_type="application/json")
+
+respuesta_html_alternativa = {
+    200: {
+        "description": "Tabla HTML o JSON según formato",
+        "content": {"text/html": {"schema": {"type": "string"}}},
+    }
+}
+
 
 @app.get("/top_plataformas/tabla", response_class=HTMLResponse)
 def top_juegos_por_plataforma(
@@ -73,7 +448,7 @@ def top_juegos_por_plataforma(
         """
         
         # Ejecutar consulta
-        df = pd.read_sql(query, con=engine, params=(f"%{plataforma}%", limit))
+        df = pd.read_sql(query, con=engines['ligera'], params=(f"%{plataforma}%", limit))
         
         if df.empty:
             return HTMLResponse(
@@ -130,6 +505,7 @@ def top_juegos_por_plataforma(
         return HTMLResponse(content=html_content)
         
     except Exception as e:
+        verificar_cancelacion(e)
         raise HTTPException(
             status_code=500,
             detail=f"Error al generar tabla: {str(e)}"
@@ -157,7 +533,7 @@ def exitos_por_año(year: int = 2010):
         ORDER BY "Ventas (M)" DESC
         LIMIT 10;
         """
-        df = pd.read_sql(query, con=engine, params=(year,))
+        df = pd.read_sql(query, con=engines['ligera'], params=(year,))
         
         if df.empty:
             return HTMLResponse(
@@ -208,6 +584,7 @@ def exitos_por_año(year: int = 2010):
         return HTMLResponse(content=html_content)
         
     except Exception as e:
+        verificar_cancelacion(e)
         raise HTTPException(
             status_code=500,
             detail=f"Error al generar tabla: {str(e)}"
@@ -235,7 +612,7 @@ def plataformas_decada(decada: int = 2000):
         ORDER BY "Ventas Totales (M)" DESC
         LIMIT 10;
         """
-        df = pd.read_sql(query, con=engine, params=(start_year, end_year))
+        df = pd.read_sql(query, con=engines['ligera'], params=(start_year, end_year))
         
         if df.empty:
             return HTMLResponse(
@@ -286,6 +663,7 @@ def plataformas_decada(decada: int = 2000):
         return HTMLResponse(content=html_content)
         
     except Exception as e:
+        verificar_cancelacion(e)
         raise HTTPException(
             status_code=500,
             detail=f"Error al generar tabla: {str(e)}"
@@ -367,6 +745,12 @@ def menu_tablas():
                     <p>Muestra los juegos más vendidos para una plataforma específica</p>
                     <a href="/top_plataformas/tabla?plataforma=psp" class="btn">Ver Tabla</a>
                 </div>
+                
+                <div class="card">
+                    <h2>Exploración Cruzada</h2>
+                    <p>Combina filtros de plataforma, género, región, editora y años, agrupando las ventas por cualquier dimensión</p>
+                    <a href="/explorar?plataforma=PS2&plataforma=Wii&genero=Sports&region=Europe&año_desde=2005&año_hasta=2009" class="btn">Ver Tabla</a>
+                </div>
             </div>
         </body>
     </html>
@@ -413,7 +797,7 @@ def comparar_editoras(
         """
         
         # Ejecutar con parámetros en orden correcto
-        df = pd.read_sql(query, con=engine, 
+        df = pd.read_sql(query, con=engines['grafico'], 
                         params=(region, publisher1, publisher2, publisher1, publisher2))
         
         # Verificar que tengamos datos para ambas editoras
@@ -474,6 +858,7 @@ def comparar_editoras(
         return StreamingResponse(buf, media_type="image/png")
         
     except Exception as e:
+        verificar_cancelacion(e)
         raise HTTPException(
             status_code=500,
             detail=f"Error al generar gráfico comparativo: {str(e)}"
@@ -498,7 +883,7 @@ def distribucion_ventas_juego(game_name: str = "Mario"):
         WHERE g.game_name LIKE %s
         GROUP BY r.region_name
         """
-        df = pd.read_sql(query, con=engine, params=(f"%{game_name}%",))
+        df = pd.read_sql(query, con=engines['grafico'], params=(f"%{game_name}%",))
         
         fig, ax = plt.subplots(figsize=(8, 8))
         df.plot(x='region_name', y='total_sales', kind='pie', 
@@ -512,6 +897,7 @@ def distribucion_ventas_juego(game_name: str = "Mario"):
         plt.close()
         return StreamingResponse(buf, media_type="image/png")
     except Exception as e:
+        verificar_cancelacion(e)
         raise HTTPException(status_code=500, detail=str(e))
     
 
@@ -541,7 +927,7 @@ def comparativa_ventas_regiones(game1: str = "Mario", game2: str = "Zelda"):
         """
         
         params = (f"%{game1}%", f"%{game2}%", f"%{game1}%", f"%{game2}%")
-        df = pd.read_sql(query, con=engine, params=params)
+        df = pd.read_sql(query, con=engines['grafico'], params=params)
         
         if df.empty:
             return Response(
@@ -592,13 +978,18 @@ def comparativa_ventas_regiones(game1: str = "Mario", game2: str = "Zelda"):
         return StreamingResponse(buf, media_type="image/png")
         
     except Exception as e:
+        verificar_cancelacion(e)
         raise HTTPException(
             status_code=500,
             detail=f"Error al generar gráfico comparativo: {str(e)}"
         )
     
 
-@app.get("/publishers", response_class=HTMLResponse)
+@app.get(
+    "/publishers",
+    response_model=List[PublisherResumen],
+    responses=respuesta_html_alternativa
+)
 def listar_publishers(
     nombre: str = Query(None, description="Filtrar por nombre (búsqueda parcial)"),
     ventas_minimas: float = Query(None, description="Ventas mínimas en millones"),
@@ -655,7 +1046,7 @@ def listar_publishers(
         params.append(limit)
         
         # Ejecutar consulta
-        df = pd.read_sql(query, con=engine, params=params)
+        df = pd.read_sql(query, con=engines['pesada'], params=tuple(params))
         
         if df.empty:
             raise HTTPException(
@@ -665,7 +1056,7 @@ def listar_publishers(
         
         # Formatear respuesta según el formato solicitado
         if formato == 'json':
-            return df.to_dict(orient='records')
+            return respuesta_json(df)
             
         # HTML por defecto
         html_content = f"""
@@ -732,13 +1123,183 @@ def listar_publishers(
     except HTTPException:
         raise
     except Exception as e:
+        verificar_cancelacion(e)
         raise HTTPException(
             status_code=500,
             detail=f"Error al obtener publishers: {str(e)}"
         )
 
 
+@app.get(
+    "/explorar",
+    response_model=List[ExploracionFila],
+    responses=respuesta_html_alternativa
+)
+def explorar(
+    plataforma: List[str] = Query(None, description="Plataformas a incluir (ej: PS2, Wii)"),
+    genero: List[str] = Query(None, description="Géneros a incluir (ej: Sports)"),
+    region: List[str] = Query(None, description="Regiones a incluir (ej: Europe)"),
+    editora: List[str] = Query(None, description="Editoras a incluir (nombre exacto)"),
+    año_desde: int = Query(None, description="Año de lanzamiento inicial"),
+    año_hasta: int = Query(None, description="Año de lanzamiento final"),
+    agrupar_por: str = Query('plataforma', description="Dimensión de agrupación (plataforma/genero/region/editora/año)"),
+    limit: int = Query(10, description="Límite de resultados"),
+    formato: str = Query('html', description="Formato de respuesta (html/json)")
+):
+    """
+    Exploración cruzada de ventas combinando filtros sobre varias dimensiones
+    
+    Los valores de una misma dimensión se combinan con OR y las dimensiones
+    entre sí con AND, p.ej. plataforma=PS2&plataforma=Wii&genero=Sports&region=Europe
+    &año_desde=2005&año_hasta=2009
+    """
+    if indice_bitmaps is None:
+        raise HTTPException(
+            status_code=503,
+            detail="El índice de exploración no está disponible"
+        )
+    if agrupar_por not in indice_bitmaps['dimensiones']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dimensión de agrupación no válida: {agrupar_por}"
+        )
+    
+    try:
+        dims = indice_bitmaps['dimensiones']
+        n_filas = indice_bitmaps['n_filas']
+        vacio = np.zeros((n_filas + 7) // 8, dtype=np.uint8)
+        seleccion = np.full_like(vacio, 0xFF)
+        filtros_aplicados = []
+        
+        # Un bitmap por dimensión filtrada (OR de sus valores), luego AND entre dimensiones
+        filtros = {'plataforma': plataforma, 'genero': genero, 'region': region, 'editora': editora}
+        for dimension, valores in filtros.items():
+            if not valores:
+                continue
+            dim = dims[dimension]
+            codigos = [dim['por_nombre'].get(v.lower()) for v in valores]
+            bitmaps = [dim['bitmaps'][c] for c in codigos if c is not None]
+            bitmap_dim = np.bitwise_or.reduce(bitmaps) if bitmaps else vacio
+            np.bitwise_and(seleccion, bitmap_dim, out=seleccion)
+            filtros_aplicados.append(f"{dimension}: {', '.join(valores)}")
+        
+        if año_desde is not None or año_hasta is not None:
+            dim = dims['año']
+            desde = año_desde if año_desde is not None else dim['valores'].min()
+            hasta = año_hasta if año_hasta is not None else dim['valores'].max()
+            en_rango = np.flatnonzero((dim['valores'] >= desde) & (dim['valores'] <= hasta))
+            bitmaps = [dim['bitmaps'][c] for c in en_rango]
+            bitmap_dim = np.bitwise_or.reduce(bitmaps) if bitmaps else vacio
+            np.bitwise_and(seleccion, bitmap_dim, out=seleccion)
+            filtros_aplicados.append(f"año: {desde}-{hasta}")
+        
+        # Suma agrupada vectorizada sobre las filas seleccionadas
+        mascara = np.unpackbits(seleccion, count=n_filas).astype(bool)
+        grupo = dims[agrupar_por]
+        codigos = grupo['codigos'][mascara]
+        ventas = indice_bitmaps['ventas'][mascara]
+        validos = codigos >= 0
+        totales = np.bincount(codigos[validos], weights=ventas[validos],
+                              minlength=len(grupo['nombres']))
+        
+        orden = np.argsort(-totales, kind='stable')
+        orden = orden[totales[orden] > 0][:limit]
+        etiqueta = agrupar_por.capitalize()
+        df = pd.DataFrame({
+            etiqueta: grupo['nombres'][orden],
+            "Ventas (M)": np.round(totales[orden], 2),
+        })
+        
+        if df.empty:
+            raise HTTPException(
+                status_code=404,
+                detail="No se encontraron ventas con los filtros especificados"
+            )
+        
+        if formato == 'json':
+            return respuesta_json(df.rename(columns={etiqueta: "Grupo"}))
+        
+        html_content = f"""
+        <html>
+            <head>
+                <title>Exploración de ventas por {agrupar_por}</title>
+                <style>
+                    body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                    h2 {{ color: #2c3e50; text-align: center; }}
+                    .filtros {{
+                        background: #f8f9fa;
+                        padding: 15px;
+                        border-radius: 5px;
+                        margin-bottom: 20px;
+                    }}
+                    table {{
+                        width: 80%;
+                        margin: 20px auto;
+                        border-collapse: collapse;
+                    }}
+                    th, td {{
+                        padding: 10px;
+                        text-align: left;
+                        border-bottom: 1px solid #ddd;
+                    }}
+                    th {{
+                        background-color: #3498db;
+                        color: white;
+                    }}
+                    tr:nth-child(even) {{ background-color: #f2f2f2; }}
+                    tr:hover {{ background-color: #e6f7ff; }}
+                </style>
+            </head>
+            <body>
+                <h2>Ventas por {agrupar_por}</h2>
+                
+                <div class="filtros">
+                    <strong>Filtros aplicados:</strong>
+                    {"".join(f"<div>{f}</div>" for f in filtros_aplicados) or "<div>Ninguno</div>"}
+                </div>
+                
+                {df.to_html(index=False, classes='data-table', float_format='{:,.2f}'.format)}
+            </body>
+        </html>
+        """
+        
+        return HTMLResponse(content=html_content)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al explorar ventas: {str(e)}"
+        )
 
 
+# Precalentamiento de la caché tras cada despliegue
+parametros_precalentar = (
+    [f"/tendencias/plataformas_decada/tabla?decada={d}" for d in (1980, 1990, 2000, 2010)]
+    + [f"/analisis/exitos_por_año/tabla?year={y}" for y in range(2000, 2017)]
+    + [f"/top_plataformas/tabla?plataforma={p}" for p in ("psp", "ps2", "ps3", "wii", "x360", "ds", "pc")]
+    + ["/publishers", "/publishers?formato=json", "/explorar", "/explorar?agrupar_por=genero"]
+)
 
-
+def precalentar_cache():
+    base = f"http://127.0.0.1:{os.getenv('API_PORT', '8000')}"
+    # Esperar a que uvicorn acepte conexiones
+    for _ in range(30):
+        try:
+            urllib.request.urlopen(f"{base}/tablas", timeout=5).read()
+            break
+        except Exception:
+            time.sleep(1)
+    else:
+        print("Precalentamiento de caché cancelado: la API no responde")
+        return
+    
+    enlaces_menu = re.findall(r'href="([^"]+)"', menu_tablas().body.decode())
+    urls = list(dict.fromkeys(enlaces_menu + parametros_precalentar))
+    for url in urls:
+        try:
+            urllib.request.urlopen(base + urllib.parse.quote(url, safe="/?=&"), timeout=120).read()
+        except Exception as e:
+            print(f"Error al precalentar {url}: {str(e)}")
+    print(f"Caché precalentada con {len(urls)} consultas")
@@ -0,0 +1,18 @@
+"""
+Serialización JSON rápida de DataFrames
+
+Sin dependencias de la base de datos para poder importarse desde main.py y
+desde benchmark_json.py sin abrir conexiones.
+"""
+import orjson
+
+
+def codificar_filas(df):
+    """
+    Codifica un DataFrame como lista de objetos JSON por columnas: tolist()
+    convierte cada columna a tipos nativos de una vez y orjson genera los
+    bytes directamente, sin pasar por jsonable_encoder
+    """
+    columnas = list(df.columns)
+    valores = [df[col].tolist() for col in columnas]
+    return orjson.dumps([dict(zip(columnas, fila)) for fila in zip(*valores)])
@@ -0,0 +1,90 @@
+"""
+Verificación de /explorar contra los endpoints SQL
+
+Compara, para cada década, los totales por plataforma de
+/tendencias/plataformas_decada/tabla con los de /explorar agrupando por
+plataforma en el mismo rango de años. Falla si /explorar no está disponible
+(p.ej. el índice de bitmaps no se construyó) o si algún total no coincide.
+
+Uso: python verificar_explorar.py [http://localhost:8000]
+"""
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from html.parser import HTMLParser
+
+TOLERANCIA = 0.011  # ambos lados redondean la suma a 2 decimales
+DECADAS = (1990, 2000, 2010)
+
+
+class CeldasTabla(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.filas = []
+        self._en_celda = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self.filas.append([])
+        elif tag == 'td':
+            self._en_celda = True
+            self.filas[-1].append('')
+
+    def handle_endtag(self, tag):
+        if tag == 'td':
+            self._en_celda = False
+
+    def handle_data(self, data):
+        if self._en_celda:
+            self.filas[-1][-1] += data.strip()
+
+
+def obtener(url):
+    with urllib.request.urlopen(url, timeout=120) as respuesta:
+        return respuesta.read().decode()
+
+
+def totales_sql(base, decada):
+    parser = CeldasTabla()
+    parser.feed(obtener(f"{base}/tendencias/plataformas_decada/tabla?decada={decada}"))
+    return {fila[0]: float(fila[1].replace(',', '')) for fila in parser.filas if len(fila) == 2}
+
+
+def totales_explorar(base, decada):
+    url = (
+        f"{base}/explorar?agrupar_por=plataforma&formato=json&limit=1000"
+        f"&a%C3%B1o_desde={decada}&a%C3%B1o_hasta={decada + 9}"
+    )
+    return {fila["Grupo"]: fila["Ventas (M)"] for fila in json.loads(obtener(url))}
+
+
+def verificar(base):
+    errores = []
+    for decada in DECADAS:
+        try:
+            sql = totales_sql(base, decada)
+            explorar = totales_explorar(base, decada)
+        except urllib.error.HTTPError as e:
+            errores.append(f"{decada}: {e.url} respondió {e.code}")
+            continue
+        if not sql:
+            errores.append(f"{decada}: la tabla SQL no devolvió filas")
+        for plataforma, total in sql.items():
+            if abs(explorar.get(plataforma, 0.0) - total) > TOLERANCIA:
+                errores.append(
+                    f"{decada} {plataforma}: SQL={total:.2f} explorar={explorar.get(plataforma, 0.0):.2f}"
+                )
+        print(f"Década {decada}: {len(sql)} plataformas comparadas")
+    return errores
+
+
+if __name__ == "__main__":
+    base = sys.argv[1] if len(sys.argv) > 1 else f"http://localhost:{os.getenv('API_PORT', '8000')}"
+    errores = verificar(base.rstrip('/'))
+    for error in errores:
+        print(f"ERROR {error}")
+    if errores:
+        sys.exit(1)
+    print("Los totales de /explorar coinciden con los endpoints SQL")